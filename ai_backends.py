@@ -1,17 +1,28 @@
 import requests
 import time
 from typing import List
+from requests.adapters import HTTPAdapter
+
+from organizer_core import BAD_CHARS_TABLE
 
 # Request timeouts
+CONNECT_TIMEOUT = 5
 OLLAMA_TIMEOUT = 30
 API_TIMEOUT = 60
 
+# Shared keep-alive session so per-file calls reuse sockets/TLS connections
+HTTP_POOL_SIZE = 32
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
 
 def list_ollama_models() -> List[str]:
     """Return available Ollama models from the local daemon."""
     try:
         url = "http://localhost:11434/api/tags"
-        response = requests.get(url, timeout=10)
+        response = _SESSION.get(url, timeout=(CONNECT_TIMEOUT, 10))
         response.raise_for_status()
         data = response.json()
         models = data.get("models", [])
@@ -36,7 +47,7 @@ def _ollama_generate(model: str, prompt: str) -> str:
             "num_ctx": 4096,
         },
     }
-    response = requests.post(url, json=payload, timeout=OLLAMA_TIMEOUT)
+    response = _SESSION.post(url, json=payload, timeout=(CONNECT_TIMEOUT, OLLAMA_TIMEOUT))
     response.raise_for_status()
     result = response.json()
     return (result.get("response") or "").strip()
@@ -62,7 +73,7 @@ def _openai_chat(api_key: str, model: str, prompt: str) -> str:
         "temperature": 0.1,
         "stop": ["\n\n", "Path:", "Folder:"],
     }
-    response = requests.post(url, headers=headers, json=payload, timeout=API_TIMEOUT)
+    response = _SESSION.post(url, headers=headers, json=payload, timeout=(CONNECT_TIMEOUT, API_TIMEOUT))
     response.raise_for_status()
     data = response.json()
     choices = data.get("choices") or []
@@ -91,7 +102,7 @@ def _grok_chat(api_key: str, model: str, prompt: str) -> str:
         "temperature": 0.1,
         "stop": ["\n\n", "Path:", "Folder:"],
     }
-    response = requests.post(url, headers=headers, json=payload, timeout=API_TIMEOUT)
+    response = _SESSION.post(url, headers=headers, json=payload, timeout=(CONNECT_TIMEOUT, API_TIMEOUT))
     response.raise_for_status()
     data = response.json()
     choices = data.get("choices") or []
@@ -116,7 +127,7 @@ def test_ai_connection(backend: str, model: str, api_key: str = "") -> tuple[boo
                 return False, "No model selected"
             # ping daemon
             try:
-                requests.get("http://localhost:11434/api/tags", timeout=5).raise_for_status()
+                _SESSION.get("http://localhost:11434/api/tags", timeout=5).raise_for_status()
             except Exception:
                 return False, "Ollama not reachable on localhost:11434"
             out = query_ollama(model, test_prompt)
@@ -176,9 +187,7 @@ def validate_folder_path(path: str) -> str:
     # strip common surrounding quotes/backticks
     if text and text[0] in {'"', "'", "`"} and text[-1:] == text[0]:
         text = text[1:-1]
-    text = text.replace("\\", "/").strip("/")
-    for ch in '<>:"|?*':
-        text = text.replace(ch, "")
+    text = text.replace("\\", "/").strip("/").translate(BAD_CHARS_TABLE)
     parts = [p for p in text.split("/") if p]
     return "/".join(parts[:3]) or "Uncategorized"
 
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import os
 import re
+import errno
 import json
 import csv
 import time
@@ -8,14 +9,27 @@ import shutil
 import threading
 import tempfile
 import difflib
+import hashlib
+import struct
 from pathlib import Path
-from typing import Optional, Tuple, List, Dict, Iterable
-from collections import defaultdict, Counter
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Tuple, List, Dict, Iterable, Iterator, Pattern
+from collections import defaultdict, Counter, deque, OrderedDict
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
+try:
+    import orjson  # optional: much faster history (de)serialization
+except ImportError:
+    orjson = None
+
+try:
+    from rapidfuzz import fuzz, process as rf_process  # optional: C++ prefilter for snapping
+except ImportError:
+    rf_process = None
+
 from ai_backends import (
     query_ollama,
     query_openai,
@@ -23,18 +37,96 @@ from ai_backends import (
     list_ollama_models,
     test_ai_connection,
     optimize_prompt_for_backend,
+    HTTP_POOL_SIZE,
 )
+from organizer_core import sanitize_path
 
 
 AI_BACKENDS = ["Local (Ollama)", "OpenAI", "Grok"]
 
 HISTORY_FILE = "organizer_history.json"
+# append-only journal of cache updates since the last HISTORY_FILE snapshot
+HISTORY_LOG_FILE = "organizer_history.log"
 RULES_FILE = "organizer_rules.json"
 DEFAULT_MAX_WORKERS = max(4, os.cpu_count() or 4)
+# file moves are syscall-bound and independent; overlap a bounded number of them
+MOVE_MAX_WORKERS = min(16, (os.cpu_count() or 4) * 4)
+# AI calls are network-bound: size the scan pool to the HTTP pool, not the CPU count
+AI_MAX_WORKERS = max(DEFAULT_MAX_WORKERS, HTTP_POOL_SIZE)
+# a local Ollama server shares one GPU/CPU; more parallel requests only queue there
+LOCAL_AI_MAX_WORKERS = max(2, (os.cpu_count() or 4) // 2)
+
+# scan results are pushed to the Treeview in batches on a timer
+TREE_FLUSH_MS = 50
+TREE_FLUSH_BATCH = 500
+# the scan thread writes buffered temp-log lines at most this often
+TMP_LOG_FLUSH_MS = 1000
+# new history entries are journaled every N results; the snapshot is rewritten
+# only once the journal outgrows the live cache
+HISTORY_CHECKPOINT_EVERY = 200
 
 TERRAFORM_SUBPATH = Path("infrastructure/terraform")
 PROJECT_MARKERS = {".git", "package.json", "go.mod", "pyproject.toml", "main.tf"}
-TF_EXTS = {".tf", ".tfvars", ".tfstate", ".lock.hcl"}
+# single-dot extensions are looked up by suffix; multi-dot names such as
+# .terraform.lock.hcl (suffix ".hcl") can only be matched on the full name
+TF_EXTS = {".tf", ".tfvars", ".tfstate"}
+TF_NAME_SUFFIXES = (".lock.hcl",)
+_TF_SUFFIXES = tuple(TF_EXTS) + TF_NAME_SUFFIXES
+# directory listings kept across walks (validated by the directory's mtime)
+DIR_LISTING_CACHE_MAX = 50_000
+# vendored/generated trees: still mapped for snapping, but Terraform files
+# inside them do not make the folder a Terraform project
+SKIP_DIRS = frozenset({".git", "node_modules", ".venv", "venv", "__pycache__", "dist", "build"})
+_SKIP_PREFIXES = (".DS_Store", "._")
+# file hint category per extension: one dict lookup per file; media hints
+# also carry the file size
+_HINT_KINDS = {
+    **dict.fromkeys((".jpg", ".jpeg", ".png", ".heic", ".webp", ".tif", ".tiff"), "Image"),
+    **dict.fromkeys((".mp3", ".m4a", ".flac", ".wav", ".aac", ".ogg"), "Audio"),
+    **dict.fromkeys((".mp4", ".mov", ".mkv", ".avi", ".webm"), "Video"),
+    **dict.fromkeys((".pdf", ".doc", ".docx", ".ppt", ".pptx", ".xls", ".xlsx", ".md", ".txt", ".rtf"), "Doc"),
+    **dict.fromkeys(TF_EXTS, "Terraform"),
+}
+_SIZED_KINDS = frozenset({"Image", "Audio", "Video"})
+
+# constant prompt instructions; only root/taxonomy (per scan) and the file
+# data (per file) are appended
+_FIRST_PASS_INSTRUCTIONS = (
+    "Return ONLY a relative folder path (1-3 levels) to organize the file. "
+    "Prefer EXISTING folders from the taxonomy below. If a close synonym exists, use the existing folder name (do not invent new top-level names).\n"
+    "Rules:\n- Output ONLY the path on one line\n- Use forward slashes\n- Max depth 3\n- If uncertain, reply 'Uncategorized'\n\n"
+)
+_REFINE_INSTRUCTIONS = (
+    "Given a candidate folder path, improve it ONLY if it conflicts with the existing taxonomy; otherwise return it unchanged.\n"
+    "Output ONLY the path. Max depth 3. Prefer existing folder names from the taxonomy.\n"
+)
+
+
+def _suffix_lower(name: str) -> str:
+    # Path.suffix, lowercased, without re-deriving the name from a Path
+    i = name.rfind(".")
+    return name[i:].lower() if 0 < i < len(name) - 1 else ""
+
+
+def _json_bytes(obj) -> bytes:
+    # names that are not valid UTF-8 carry surrogate escapes (caf\udce9.pdf);
+    # orjson and UTF-8 encoding reject them, ASCII-escaped JSON keeps them
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:  # orjson.JSONEncodeError
+            pass
+    return json.dumps(obj, separators=(",", ":")).encode("ascii")
+
+
+def _json_loads(data: bytes):
+    # orjson refuses the escaped lone surrogates written above; json reads them
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except ValueError:  # orjson.JSONDecodeError
+            pass
+    return json.loads(data)
 
 
 class OrganizerApp(tk.Tk):
@@ -47,18 +139,28 @@ class OrganizerApp(tk.Tk):
 
         self.scanning = False
         self.cancel_event = threading.Event()
-        self.current_futures = set()
-        self.executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS)
+        self._executor_workers = AI_MAX_WORKERS
+        self.executor = ThreadPoolExecutor(max_workers=self._executor_workers)
 
         self.folder: Optional[Path] = None
         self.root_name: str = ""
+        self._root_lower: str = ""
+        self._tf_pinned: str = TERRAFORM_SUBPATH.as_posix()
         self.is_project: bool = False
         self.has_terraform: bool = False
 
         self.file_items: List[Tuple[Path, str, tk.BooleanVar, str]] = []
         self.model_list: List[str] = []
         self.history: Dict[str, dict] = {}
-        self.rules: Dict[str, str] = {}
+        self._history_lock = threading.Lock()  # in-memory cache state only; never held over disk I/O
+        self._history_io_lock = threading.Lock()  # serializes journal/snapshot writes
+        self._history_pending: List[bytes] = []  # journal lines not yet written
+        self._history_log_lines = 0
+        self._history_dirty = False  # memory differs from the HISTORY_FILE snapshot
+        self.rules: Dict[str, Dict[str, str]] = {}
+        # compiled from self.rules: "ext" section by suffix, "regex" section as filename regexes
+        self._rules_by_ext: Dict[str, str] = {}
+        self._rules_re: List[Tuple[Pattern, str]] = []
 
         self._load_history()
         self._load_rules()
@@ -77,11 +179,39 @@ class OrganizerApp(tk.Tk):
         self.ignore_cache_this_run = False
         self.refine_two_pass_var = tk.BooleanVar(value=True)
 
+        # worker threads append, the Tk thread drains (deque ops are thread-safe)
+        self._tree_queue: deque = deque()
+        self._tree_flush_active = False
+        # (completed, submitted, walk finished) published by the scan thread, shown
+        # on each tree flush; submitted is only the total once the walk finished
+        self._scan_progress: Tuple[int, int, bool] = (0, 0, False)
+        self._shown_progress: Tuple[int, int, bool] = (0, 0, False)
+        # Treeview row id -> that row's checkbox var (toggled by clicks, no Tcl traces)
+        self._row_checks: Dict[str, tk.BooleanVar] = {}
+
         self.tmp_scan_path: Optional[Path] = None
         self.tmp_lock = threading.Lock()
+        self._tmp_fp = None
+        self._tmp_lines: List[bytes] = []
 
         # dynamic directory map for snapping
         self._dir_children: Dict[Path, List[str]] = {}
+        # lower-cased child name -> real name, per parent (exact snaps without difflib)
+        self._dir_children_lc: Dict[Path, Dict[str, str]] = {}
+        # dir path -> (mtime_ns, subdirs, lower-cased subdirs, dirs to descend, has tf file);
+        # an unchanged mtime means no entry was added/removed, so the listing is reused
+        self._dir_listing: "OrderedDict[str, Tuple[int, List[str], Dict[str, str], List[str], bool]]" = OrderedDict()
+        # (parent, segment, cutoff) -> fuzzy snap result; AI replies repeat heavily
+        self._snap_memo: Dict[Tuple[Path, str, float], str] = {}
+        # (rel, cutoff) -> fully snapped path; whole suggestions repeat across files
+        self._snap_paths: Dict[Tuple[str, float], str] = {}
+        self._taxonomy_ctx: str = ""
+        self._first_prompt_head: str = ""
+        self._refine_prompt_head: str = ""
+        # neighbor context is the same for every file in a directory; one entry per parent
+        self._neighbor_cache: Dict[Path, str] = {}
+        # directory -> (subdir names, file names), filled by the scan walk
+        self._dir_siblings: Dict[Path, Tuple[List[str], List[str]]] = {}
 
         self._build_ui()
         self._on_backend_change()
@@ -126,6 +256,7 @@ class OrganizerApp(tk.Tk):
         self.tree.heading("Target Path", text="Target Organization Path"); self.tree.column("Target Path", width=620, anchor=tk.W, stretch=True)
         self.tree.heading("Status", text="Status"); self.tree.column("Status", width=200, anchor=tk.W, stretch=False)
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.tree.bind("<Button-1>", self._on_tree_click)
         y_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
         y_scroll.pack(side=tk.RIGHT, fill=tk.Y); self.tree.configure(yscrollcommand=y_scroll.set)
         x_scroll = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
@@ -147,9 +278,13 @@ class OrganizerApp(tk.Tk):
             return
         self.folder = Path(folder)
         self.root_name = self.folder.name
+        self._root_lower = self.root_name.lower()
+        # '/'-joined like every other target; organize splits targets on '/'
+        self._tf_pinned = f"{self.root_name}/{TERRAFORM_SUBPATH.as_posix()}"
         self.folder_lbl.configure(text=str(self.folder))
         self.status_var.set("Ready.")
-        self.is_project, self.has_terraform = self._detect_project(self.folder)
+        self.is_project = self._detect_project(self.folder)
+        # one walk builds the directory map and notes Terraform files
         self._build_dir_children()
         self._clear_tree()
 
@@ -188,15 +323,26 @@ class OrganizerApp(tk.Tk):
         self._start_scan()
 
     def _on_clear_cache(self):
-        if os.path.exists(HISTORY_FILE):
-            try:
-                os.remove(HISTORY_FILE)
+        # io lock first: no journal flush or compaction can run between the
+        # in-memory reset and the file removal and bring entries back
+        with self._history_io_lock:
+            with self._history_lock:
                 self.history = {}
-                messagebox.showinfo("Cache cleared", "Deleted organizer_history.json and reset cache.")
+                self._history_pending = []
+                self._history_log_lines = 0
+                self._history_dirty = False
+            found = [fn for fn in (HISTORY_FILE, HISTORY_LOG_FILE) if os.path.exists(fn)]
+            err = None
+            try:
+                for fn in found:
+                    os.remove(fn)
             except Exception as e:
-                messagebox.showerror("Error", f"Could not delete cache file: {e}")
+                err = e
+        if err is not None:
+            messagebox.showerror("Error", f"Could not delete cache file: {err}")
+        elif found:
+            messagebox.showinfo("Cache cleared", "Deleted organizer_history.json and reset cache.")
         else:
-            self.history = {}
             messagebox.showinfo("Cache cleared", "No cache file found; in‑memory cache reset.")
 
     def _start_scan(self):
@@ -205,17 +351,30 @@ class OrganizerApp(tk.Tk):
             return
         if self.scanning:
             return
+        self._close_temp_log()
         try:
             tmpdir = Path(tempfile.gettempdir())
             self.tmp_scan_path = tmpdir / f"ai_scan_{int(time.time())}.jsonl"
+            self._tmp_fp = open(self.tmp_scan_path, "ab", buffering=65536)
         except Exception:
             self.tmp_scan_path = None
+            self._tmp_fp = None
+
+        # size the scan pool for the backend; only rebuild it when that changes
+        workers = LOCAL_AI_MAX_WORKERS if self.selected_backend.get() == "Local (Ollama)" else AI_MAX_WORKERS
+        if workers != self._executor_workers:
+            self.executor.shutdown(wait=False)
+            self._executor_workers = workers
+            self.executor = ThreadPoolExecutor(max_workers=workers)
 
         self.scanning = True
         self.cancel_event.clear()
-        self.current_futures.clear()
-        self.progress_var.set(0)
+        self._scan_progress = self._shown_progress = (0, 0, False)
+        self._set_progress_busy(True)
         self.status_var.set("Scanning...")
+        if not self._tree_flush_active:
+            self._tree_flush_active = True
+            self.after(TREE_FLUSH_MS, self._flush_tree_queue)
         threading.Thread(target=self._scan_folder_async, daemon=True).start()
 
     def _on_cancel_scan(self):
@@ -223,14 +382,37 @@ class OrganizerApp(tk.Tk):
             return
         self.scanning = False
         self.cancel_event.set()
-        for fut in list(self.current_futures):
-            fut.cancel()
+        # drop queued work in one call; in-flight workers see cancel_event
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = ThreadPoolExecutor(max_workers=self._executor_workers)
+        self._flush_temp_log()
         self.status_var.set("Cancelling scan...")
 
+    def _on_close(self):
+        self.scanning = False
+        self.cancel_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self._close_temp_log()
+        self._flush_history_log()
+        self.destroy()
+
     def _on_select_all(self):
         v = self.select_all_var.get()
         for (_, _, checked, _) in self.file_items:
             checked.set(v)
+        mark = "☑" if v else "☐"
+        for iid in self._row_checks:
+            self.tree.set(iid, "Select", mark)
+
+    def _on_tree_click(self, event):
+        if self.tree.identify_region(event.x, event.y) != "cell" or self.tree.identify_column(event.x) != "#1":
+            return
+        iid = self.tree.identify_row(event.y)
+        checked = self._row_checks.get(iid)
+        if checked is None:
+            return
+        checked.set(not checked.get())
+        self.tree.set(iid, "Select", "☑" if checked.get() else "☐")
 
     def _on_organize(self):
         sel = [(s, t, c, st) for (s, t, c, st) in self.file_items if c.get()]
@@ -263,96 +445,176 @@ class OrganizerApp(tk.Tk):
 
     # -------------------------- Scan / AI ---------------------------
     def _scan_folder_async(self):
+        error: Optional[Exception] = None
         try:
-            files: List[Path] = []
-            for root, _, names in os.walk(self.folder):
-                if self.cancel_event.is_set():
-                    break
-                for n in names:
-                    if n.startswith(".DS_Store") or n.startswith("._"):
-                        continue
-                    files.append(Path(root) / n)
-
-            total = max(1, len(files))
             backend = self.selected_backend.get()
             model = self.selected_model.get().strip()
             api_key = self.api_key.get().strip()
             refine = self.refine_two_pass_var.get()
-
+            # refresh the snapping map (earlier organize runs may have added
+            # folders); unchanged directories are served from the listing cache
+            self._build_dir_children()
+            # taxonomy is identical for every file in a scan; build it once
+            self._taxonomy_ctx = self._build_taxonomy_prompt(max_parents=12, max_children=8)
+            # so are the prompt prefixes; files only append their own data
+            scan_ctx = f"Root: {self.root_name}\n\nExisting taxonomy (samples):\n{self._taxonomy_ctx}\n\n"
+            self._first_prompt_head = _FIRST_PASS_INSTRUCTIONS + scan_ctx
+            self._refine_prompt_head = _REFINE_INSTRUCTIONS + scan_ctx
+            self._neighbor_cache.clear()
+            self._dir_siblings.clear()
+
+            # bounded pipeline: submit while walking, but keep at most
+            # 2*workers futures in flight and drain results as they land
+            executor = self.executor
+            max_in_flight = 2 * self._executor_workers
             future_to_file: Dict = {}
-            for f in files:
-                if not self.scanning or self.cancel_event.is_set():
-                    break
-                fut = self.executor.submit(self._process_file_two_pass, f, backend, model, api_key, self.ignore_cache_this_run, refine)
-                self.current_futures.add(fut)
-                future_to_file[fut] = f
-
+            pending: set = set()
+            submitted = 0
             completed = 0
-            for fut in as_completed(future_to_file):
+            walked = False
+            # temp-log writes happen here, off the Tk thread
+            log_every = TMP_LOG_FLUSH_MS / 1000
+            next_log_flush = time.monotonic() + log_every
+
+            def drain(done) -> None:
+                nonlocal completed, next_log_flush
+                for fut in done:
+                    src = future_to_file.pop(fut)
+                    try:
+                        final_path, status = fut.result()
+                    except Exception as e:
+                        final_path, status = "Uncategorized", f"Error: {e}"
+                    checked = tk.BooleanVar(value=True)
+                    entry = (src, final_path, checked, status)
+                    self.file_items.append(entry)
+                    completed += 1
+                    self._tree_queue.append(entry)
+                    if completed % HISTORY_CHECKPOINT_EVERY == 0:
+                        self._flush_history_log()
+                self._scan_progress = (completed, submitted, walked)
+                now = time.monotonic()
+                if now >= next_log_flush:
+                    next_log_flush = now + log_every
+                    self._flush_temp_log()
+
+            for f, st in self._iter_files(self.folder):
                 if not self.scanning or self.cancel_event.is_set():
                     break
-                src = future_to_file[fut]
                 try:
-                    final_path, status = fut.result()
-                except Exception as e:
-                    final_path, status = "Uncategorized", f"Error: {e}"
-                checked = tk.BooleanVar(value=True)
-                entry = (src, final_path, checked, status)
-                self.file_items.append(entry)
-                completed += 1
-                progress = int((completed * 100) / total)
-                self.after(0, lambda e=entry: self._add_file_to_tree(e))
-                self.after(0, lambda p=progress: self.progress_var.set(p))
-                self.after(0, lambda c=completed, t=total: self.status_var.set(f"Scanning... {c}/{t}"))
-
-            for fut in future_to_file:
-                if not fut.done():
-                    fut.cancel()
-            self.current_futures.difference_update(future_to_file.keys())
+                    fut = executor.submit(self._process_file_two_pass, f, st, backend, model, api_key, self.ignore_cache_this_run, refine)
+                except RuntimeError:  # executor shut down by cancel
+                    break
+                future_to_file[fut] = f
+                pending.add(fut)
+                submitted += 1
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    drain(done)
+            walked = True
+            self._scan_progress = (completed, submitted, walked)
+
+            while pending and self.scanning and not self.cancel_event.is_set():
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                drain(done)
+
+            for fut in pending:
+                fut.cancel()
+        except Exception as e:
+            # e.g. the folder walk failing on a removed mount; per-file errors
+            # are reported on their rows by drain()
+            error = e
         finally:
-            self.after(0, self._finish_scan)
+            self._flush_temp_log()
+            self._flush_history_log()
+            if self._history_log_lines > len(self.history):
+                self._save_history()
+            self.after(0, self._finish_scan, error)
+
+    def _iter_files(self, root: Path) -> Iterator[Tuple[Path, Optional[os.stat_result]]]:
+        # scandir walk (same visiting rules as os.walk); the stat taken here is
+        # handed to the worker so the file is never stat'ed twice
+        stack = [str(root)]
+        while stack:
+            if self.cancel_event.is_set():
+                return
+            d = stack.pop()
+            try:
+                it = os.scandir(d)
+            except OSError:
+                continue
+            with it:
+                entries = list(it)
+            dir_names: List[str] = []
+            file_names: List[str] = []
+            files = []
+            for e in entries:
+                try:
+                    if e.is_dir():
+                        dir_names.append(e.name)
+                        if not e.is_symlink():
+                            stack.append(e.path)
+                        continue
+                    if e.is_file():
+                        file_names.append(e.name)
+                except OSError:
+                    pass
+                if not e.name.startswith(_SKIP_PREFIXES):
+                    files.append(e)
+            # record the listing before yielding, so workers can build neighbor
+            # context from it without reading the directory again
+            self._dir_siblings[Path(d)] = (dir_names, file_names)
+            for e in files:
+                try:
+                    st = e.stat()
+                except OSError:
+                    st = None
+                yield Path(e.path), st
 
-    def _finish_scan(self):
+    def _finish_scan(self, error: Optional[Exception] = None):
         self.scanning = False
+        self._close_temp_log()
+        self._set_progress_busy(False)
         self.progress_var.set(0)
-        self.status_var.set("Scan cancelled." if self.cancel_event.is_set() else "Scan complete.")
         self.ignore_cache_this_run = False
+        if error is not None:
+            self.status_var.set(f"Scan failed: {error}")
+            messagebox.showerror("Scan error", str(error))
+            return
+        self.status_var.set("Scan cancelled." if self.cancel_event.is_set() else "Scan complete.")
 
     # --------------------- Two‑pass worker -------------------------
-    def _process_file_two_pass(self, file_path: Path, backend: str, model: str, api_key: str, ignore_cache: bool, refine: bool) -> Tuple[str, str]:
+    def _process_file_two_pass(self, file_path: Path, st: Optional[os.stat_result], backend: str, model: str, api_key: str, ignore_cache: bool, refine: bool) -> Tuple[str, str]:
         if self.cancel_event.is_set():
             return "Uncategorized", "Cancelled"
-        sig = self._signature(file_path)
-        hint = self._build_file_hint(file_path)
-        taxonomy = self._build_taxonomy_prompt(max_parents=12, max_children=8)
-        neighbor = self._build_neighbor_context(file_path, max_siblings=12)
+        # user rules are authoritative; no AI round trip for covered files
+        rule = self._match_rule(file_path) if (self._rules_by_ext or self._rules_re) else None
+        if rule is not None:
+            return self._apply_guardrails(file_path, rule), "Rule"
+        # the pinned path would override any AI answer, so don't ask
+        if self._is_pinned_terraform(file_path):
+            return self._tf_pinned, "Pinned (Terraform)"
+        sig = self._signature(file_path, st)
+        cached = None if ignore_cache else self.history.get(sig)
+        # no pass 2 on a cache hit; refining would re-pay the call the cache saved
+        refine = refine and cached is None
+        # hint/neighbor cost stat and directory calls; only build them for prompts
+        hint = self._build_file_hint(file_path, st) if cached is None else ""
 
         # First pass
-        if not ignore_cache and sig in self.history:
-            first_path = self.history[sig].get("ai_path", "Uncategorized")
+        if cached is not None:
+            first_path = cached.get("ai_path", "Uncategorized")
             first_src = "Cached"
         else:
+            neighbor = self._build_neighbor_context(file_path, max_siblings=12)
+            # fixed instructions/taxonomy first, per-file data last, so providers
+            # with prompt-prefix caching can reuse the shared prefix across files
             base_prompt = (
-                "Return ONLY a relative folder path (1-3 levels) to organize the file. "
-                "Prefer EXISTING folders from the taxonomy below. If a close synonym exists, use the existing folder name (do not invent new top-level names).\n"
-                f"Root: {self.root_name}\n\n"
-                f"Existing taxonomy (samples):\n{taxonomy}\n\n"
+                f"{self._first_prompt_head}"
                 f"File: {file_path.name}\n{hint}\n\n"
-                f"Neighbor context:\n{neighbor}\n\n"
-                "Rules:\n- Output ONLY the path on one line\n- Use forward slashes\n- Max depth 3\n- If uncertain, reply 'Uncategorized'\n"
+                f"Neighbor context:\n{neighbor}\n"
             )
             prompt = optimize_prompt_for_backend(backend, base_prompt)
-            try:
-                if backend == "Local (Ollama)":
-                    text = query_ollama(model=model or "llama3.1", prompt=prompt)
-                elif backend == "OpenAI":
-                    text = query_openai(model=model or "gpt-4o-mini", prompt=prompt, api_key=api_key)
-                elif backend == "Grok":
-                    text = query_grok(model=model or "grok-2-mini", prompt=prompt, api_key=api_key)
-                else:
-                    text = "Uncategorized"
-            except Exception:
-                text = "Uncategorized"
+            text = self._query_ai(backend, model, api_key, prompt, fallback="Uncategorized")
             first_path = self._apply_guardrails(file_path, text)
             first_src = "AI suggested"
 
@@ -363,23 +625,11 @@ class OrganizerApp(tk.Tk):
 
         if refine:
             refine_prompt = (
-                "Given a candidate folder path, improve it ONLY if it conflicts with the existing taxonomy; otherwise return it unchanged.\n"
-                "Output ONLY the path. Max depth 3. Prefer existing folder names from the taxonomy.\n"
-                f"Root: {self.root_name}\n\nExisting taxonomy (samples):\n{taxonomy}\n\n"
+                f"{self._refine_prompt_head}"
                 f"Filename: {file_path.name}\n{hint}\nCandidate: {first_path}\n"
             )
             prompt2 = optimize_prompt_for_backend(backend, refine_prompt)
-            try:
-                if backend == "Local (Ollama)":
-                    text2 = query_ollama(model=model or "llama3.1", prompt=prompt2)
-                elif backend == "OpenAI":
-                    text2 = query_openai(model=model or "gpt-4o-mini", prompt=prompt2, api_key=api_key)
-                elif backend == "Grok":
-                    text2 = query_grok(model=model or "grok-2-mini", prompt=prompt2, api_key=api_key)
-                else:
-                    text2 = first_path
-            except Exception:
-                text2 = first_path
+            text2 = self._query_ai(backend, model, api_key, prompt2, fallback=first_path)
             refined_path = self._apply_guardrails(file_path, text2)
             final_path = refined_path or first_path
             status = f"{first_src} → Refined"
@@ -387,62 +637,34 @@ class OrganizerApp(tk.Tk):
             final_path = first_path
             status = first_src
 
-        self.history[sig] = {"ai_path": final_path, "fullpath": str(file_path), "timestamp": time.time()}
-        self._save_history()
+        if cached is None or cached.get("fullpath") != str(file_path):
+            rec = {"ai_path": final_path, "fullpath": str(file_path), "timestamp": time.time()}
+            line = _json_bytes([sig, rec])
+            with self._history_lock:
+                self.history[sig] = rec
+                self._history_pending.append(line)
+                self._history_dirty = True
         self._append_temp_log({"ts": time.time(), "source": str(file_path), "hint": hint, "first_path": first_path, "refined_path": final_path if refine else None, "status": status})
         return final_path, status
 
-    # ---------------- Parsing & Guardrails -------------------------
-    def _extract_path_from_text(self, text: str) -> str:
-        if not text:
-            return ""
-        m = re.search(r'{\s*"path"\s*:\s*"([^"]+)"}', text, flags=re.IGNORECASE)
-        if m:
-            return m.group(1).strip()
-        text = re.sub(r"```.*?```", "", text, flags=re.DOTALL)
-        text = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL | re.IGNORECASE)
-        text = re.sub(r"^#+\s.*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"\b(the cleaned compact path would be|the path would be|the best path is|final path:)\b.*", "", text, flags=re.IGNORECASE)
-        candidates = re.findall(r"([A-Za-z0-9 _.-]+(?:/[A-Za-z0-9 _.-]+){0,2})", text)
-
-        def score(c: str) -> int:
-            c_stripped = c.strip().strip("./ ")
-            penalty = 0
-            if re.search(r"\b(is|are|the|this|that|here|would)\b", c_stripped, flags=re.IGNORECASE):
-                penalty += 2
-            if len(c_stripped.split()) > 6:
-                penalty += 3
-            segs = [s for s in c_stripped.split("/") if s]
-            base = 10 - min(9, len("".join(segs)))
-            return base - penalty
-
-        candidates = [c.strip() for c in candidates if ("/" in c) or (len(c.split()) <= 4)]
-        if not candidates:
-            return ""
-        best = max(candidates, key=score).strip().strip("./ ")
-        best = re.sub(r"\s{2,}", " ", best)
-        best = re.sub(r"/{2,}", "/", best)
-        parts = [p.strip() for p in best.split("/") if p.strip()]
-        return "/".join(parts[:3])
-
-    def _sanitize_path(self, text: str) -> str:
-        extracted = self._extract_path_from_text(text)
-        candidate = extracted if extracted else (text or "")
-        candidate = candidate.strip().replace("\\", "/").splitlines()[0].lstrip("/").strip()
-        for ch in '<>:"|?*':
-            candidate = candidate.replace(ch, "")
-        if not candidate:
-            candidate = "Uncategorized"
-        parts = [p for p in candidate.split("/") if p]
-        if len(parts) > 3:
-            parts = parts[:3]
-        return "/".join(parts)
+    def _query_ai(self, backend: str, model: str, api_key: str, prompt: str, fallback: str) -> str:
+        try:
+            if backend == "Local (Ollama)":
+                return query_ollama(model=model or "llama3.1", prompt=prompt)
+            if backend == "OpenAI":
+                return query_openai(model=model or "gpt-4o-mini", prompt=prompt, api_key=api_key)
+            if backend == "Grok":
+                return query_grok(model=model or "grok-2-mini", prompt=prompt, api_key=api_key)
+        except Exception:
+            pass
+        return fallback
 
+    # ---------------- Parsing & Guardrails -------------------------
     def _apply_guardrails(self, file_path: Path, ai_path: str) -> str:
-        rel = self._sanitize_path(ai_path)
-        if self.pin_terraform_var.get() and (file_path.suffix.lower() in TF_EXTS or file_path.name.endswith(".lock.hcl")):
-            pinned = Path(self.root_name) / TERRAFORM_SUBPATH
-            return str(pinned)
+        # Terraform files are pinned; no need to parse the AI reply at all
+        if self._is_pinned_terraform(file_path):
+            return self._tf_pinned
+        rel = sanitize_path(ai_path)
         if self.stay_under_root_var.get() and not self._starts_with_root(rel):
             rel = str(Path(self.root_name) / rel)
         # snap segments to existing directories to honor local taxonomy
@@ -452,48 +674,49 @@ class OrganizerApp(tk.Tk):
             pass
         return rel
 
+    def _is_pinned_terraform(self, p: Path) -> bool:
+        if not self.pin_terraform_var.get():
+            return False
+        name = p.name
+        return _suffix_lower(name) in TF_EXTS or name.endswith(TF_NAME_SUFFIXES)
+
     def _starts_with_root(self, rel: str) -> bool:
         parts = [p for p in str(rel).strip("/").split("/") if p]
-        return (len(parts) > 0) and (parts[0].lower() == self.root_name.lower())
+        return (len(parts) > 0) and (parts[0].lower() == self._root_lower)
 
     # -------------------- Context builders -------------------------
-    def _build_file_hint(self, p: Path) -> str:
-        ext = p.suffix.lower()
-        parent = p.parent.name
+    def _build_file_hint(self, p: Path, st: Optional[os.stat_result] = None) -> str:
         name = p.name
+        ext = _suffix_lower(name)
+        parent = p.parent.name
         ancestors = "/".join([a.name for a in p.parents if a != p.anchor and a != p] [-4:][::-1])
-        if ext in {".jpg", ".jpeg", ".png", ".heic", ".webp", ".tif", ".tiff"}:
-            try:
-                size = p.stat().st_size
-            except Exception:
-                size = 0
-            return f"Type=Image; SizeBytes={size}; Name={name}; Parent={parent}; Ancestors={ancestors}"
-        if ext in {".mp3", ".m4a", ".flac", ".wav", ".aac", ".ogg"}:
-            try:
-                size = p.stat().st_size
-            except Exception:
-                size = 0
-            return f"Type=Audio; SizeBytes={size}; Name={name}; Parent={parent}; Ancestors={ancestors}"
-        if ext in {".mp4", ".mov", ".mkv", ".avi", ".webm"}:
-            try:
-                size = p.stat().st_size
-            except Exception:
-                size = 0
-            return f"Type=Video; SizeBytes={size}; Name={name}; Parent={parent}; Ancestors={ancestors}"
-        if ext in {".pdf", ".doc", ".docx", ".ppt", ".pptx", ".xls", ".xlsx", ".md", ".txt", ".rtf"}:
-            return f"Type=Doc; Name={name}; Parent={parent}; Ancestors={ancestors}"
-        if ext in TF_EXTS or p.name.endswith(".lock.hcl"):
-            return f"Type=Terraform; Name={name}; Parent={parent}; Ancestors={ancestors}"
+        kind = _HINT_KINDS.get(ext)
+        if kind is None and name.endswith(TF_NAME_SUFFIXES):
+            kind = "Terraform"
+        if kind in _SIZED_KINDS:
+            # the walker's stat is reused; only stat here when none was passed
+            if st is None:
+                try:
+                    st = p.stat()
+                except Exception:
+                    st = None
+            size = st.st_size if st is not None else 0
+            return f"Type={kind}; SizeBytes={size}; Name={name}; Parent={parent}; Ancestors={ancestors}"
+        if kind:
+            return f"Type={kind}; Name={name}; Parent={parent}; Ancestors={ancestors}"
         return f"Filename={name}; Parent={parent}; Ancestors={ancestors}; Ext={ext or '(none)'}"
 
     def _build_taxonomy_prompt(self, max_parents: int = 10, max_children: int = 8) -> str:
         if not self.folder:
             return ""
         lines: List[str] = []
-        parents = sorted([p for p in self.folder.iterdir() if p.is_dir()], key=lambda x: x.name.lower())[:max_parents]
+        # DirEntry.is_dir() answers from the dirent type; no stat per child
+        with os.scandir(self.folder) as it:
+            parents = sorted([e for e in it if e.is_dir()], key=lambda e: e.name.lower())[:max_parents]
         for par in parents:
             try:
-                kids = sorted([c.name for c in par.iterdir() if c.is_dir()], key=lambda x: x.lower())[:max_children]
+                with os.scandir(par.path) as it:
+                    kids = sorted([c.name for c in it if c.is_dir()], key=str.lower)[:max_children]
             except Exception:
                 kids = []
             if kids:
@@ -503,15 +726,31 @@ class OrganizerApp(tk.Tk):
         return "\n".join(lines) if lines else "(no subfolders yet)"
 
     def _build_neighbor_context(self, p: Path, max_siblings: int = 15) -> str:
-        try:
-            sibs = [c.name for c in p.parent.iterdir() if c.is_file()][:max_siblings]
-        except Exception:
-            sibs = []
-        try:
-            dirs = [c.name for c in p.parent.iterdir() if c.is_dir()][:max_siblings]
-        except Exception:
-            dirs = []
-        return f"ParentDir={p.parent.name}; SiblingDirs={', '.join(dirs)}; SiblingFiles={', '.join(sibs)}"
+        cached = self._neighbor_cache.get(p.parent)
+        if cached is not None:
+            return cached
+        listing = self._dir_siblings.get(p.parent)
+        if listing is not None:
+            dirs, sibs = listing[0][:max_siblings], listing[1][:max_siblings]
+        else:
+            # one scandir pass; file/dir types come from the dirents
+            sibs, dirs = [], []
+            try:
+                with os.scandir(p.parent) as it:
+                    for e in it:
+                        try:
+                            if e.is_file():
+                                sibs.append(e.name)
+                            elif e.is_dir():
+                                dirs.append(e.name)
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+            sibs, dirs = sibs[:max_siblings], dirs[:max_siblings]
+        ctx = f"ParentDir={p.parent.name}; SiblingDirs={', '.join(dirs)}; SiblingFiles={', '.join(sibs)}"
+        self._neighbor_cache[p.parent] = ctx
+        return ctx
 
     # ------------------- Organize (folder-smart) -------------------
     def _organize_files_async(self, selected_files, dest_path: Path):
@@ -521,66 +760,203 @@ class OrganizerApp(tk.Tk):
                     return anc
             return None
 
+        # split each distinct target string once (targets are already '/'-joined
+        # by sanitize_path, so no Path parsing); reused by grouping and moving
+        tgt_parts: Dict[str, Tuple[str, ...]] = {
+            t: tuple(seg for seg in t.split("/") if seg and seg != ".")
+            for t in {tgt for _, tgt, _, _ in selected_files}
+        }
+
         def maj_prefix(paths: List[str], k: int = 2) -> Tuple[str, ...]:
-            cleaned = [tuple(Path(p).parts[:k]) for p in paths if p]
+            cleaned = [tgt_parts[p][:k] for p in paths if p]
             if not cleaned:
                 return ()
-            return Counter(cleaned).most_common(1)[0][0]
+            return max(Counter(cleaned).items(), key=itemgetter(1))[0]
+
+        def dir_names(cache: Dict[Path, set], d: Path) -> set:
+            # one scandir per destination dir instead of a stat per probe;
+            # lower-cased so case-insensitive filesystems never collide
+            names = cache.get(d)
+            if names is None:
+                with os.scandir(d) as it:
+                    names = {e.name.lower() for e in it}
+                cache[d] = names
+            return names
+
+        def reserve_name(used: set, stem: str, suffix: str) -> str:
+            name = f"{stem}{suffix}"; n = 1
+            while name.lower() in used:
+                name = f"{stem}_{n}{suffix}"; n += 1
+            used.add(name.lower())
+            return name
+
+        def rename_or_move(src: str, dst: str) -> None:
+            # one rename syscall on the same filesystem; full copy only across devices
+            try:
+                os.rename(src, dst)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                shutil.move(src, dst)
 
         def organize():
             success = errors = 0
+            try:
+                same_fs = self.folder is not None and os.stat(self.folder).st_dev == os.stat(dest_path).st_dev
+            except OSError:
+                same_fs = False
+            move = rename_or_move if same_fs else shutil.move
+            # run-invariant settings, read once (each Tk variable read is a Tcl round trip)
+            stay_under = self.stay_under_root_var.get()
+            folder_mode = self.prefer_folder_move_var.get() and self.is_project
+            root_name = self.root_name
+            root_lower = root_name.lower()
+            checked = [(src, tgt) for src, tgt, chk, _ in selected_files if chk.get()]
+
+            # specialize the stay-under-root rule once for this run
+            if stay_under:
+                def with_root(p: Tuple[str, ...]) -> Tuple[str, ...]:
+                    return p if (p and p[0].lower() == root_lower) else (root_name,) + p
+            else:
+                def with_root(p: Tuple[str, ...]) -> Tuple[str, ...]:
+                    return p
+
             groups: Dict[Path, List[Tuple[Path, str]]] = defaultdict(list)
-            for src, tgt, chk, _ in selected_files:
-                if not chk.get():
-                    continue
+            for src, tgt in checked:
                 root = top_app_bundle(src) or src.parent
                 groups[root].append((src, tgt))
 
             folder_moves: Dict[Path, Path] = {}
             for src_dir, items in groups.items():
                 tgts = [t for _, t in items]
-                counts = Counter(tuple(Path(t).parts[:2]) for t in tgts if t)
-                agree = (counts.most_common(1)[0][1] / len(tgts)) if tgts else 0.0
-                if (self.prefer_folder_move_var.get() and self.is_project) or src_dir.suffix.lower() == ".app" or (len(items) > 4 and agree >= 0.6):
-                    base = Path(*maj_prefix(tgts, k=2)) if tgts else Path(self.root_name if self.stay_under_root_var.get() else "Uncategorized")
-                    if self.stay_under_root_var.get():
-                        if not (len(base.parts) > 0 and base.parts[0].lower() == self.root_name.lower()):
-                            base = Path(self.root_name) / base
-                    folder_moves[src_dir] = dest_path / base / src_dir.name
-
+                counts = Counter(tgt_parts[t][:2] for t in tgts if t)
+                agree = (max(counts.values()) / len(tgts)) if counts else 0.0
+                if folder_mode or src_dir.suffix.lower() == ".app" or (len(items) > 4 and agree >= 0.6):
+                    base_parts = maj_prefix(tgts, k=2) if tgts else (root_name if stay_under else "Uncategorized",)
+                    folder_moves[src_dir] = dest_path.joinpath(*with_root(base_parts), src_dir.name)
+
+            # a folder cannot move into itself (the project root when the destination
+            # is the project or its parent); its files are moved one by one instead
+            for src_dir in [d for d, t in folder_moves.items() if t == d or d in t.parents]:
+                del folder_moves[src_dir]
+
+            # moves sharing a destination parent (shared name set) or nested in one
+            # another run in order in one worker; the rest run concurrently
+            link: Dict[Path, Path] = {d: d for d in folder_moves}
+
+            def find(d: Path) -> Path:
+                while link[d] != d:
+                    link[d] = d = link[link[d]]
+                return d
+
+            first_by_parent: Dict[Path, Path] = {}
             for src_dir, dst_dir in folder_moves.items():
+                link[find(src_dir)] = find(first_by_parent.setdefault(dst_dir.parent, src_dir))
+                anc = next((a for a in src_dir.parents if a in folder_moves), None)
+                if anc is not None:
+                    link[find(src_dir)] = find(anc)
+
+            names_by_dir: Dict[Path, set] = {}
+            ready_parents: set = set()
+            for parent in first_by_parent:
                 try:
-                    dst_dir.parent.mkdir(parents=True, exist_ok=True)
-                    candidate = dst_dir; i = 1
-                    while candidate.exists():
-                        candidate = dst_dir.with_name(f"{dst_dir.name}_{i}"); i += 1
-                    shutil.move(str(src_dir), str(candidate))
-                    success += 1
+                    parent.mkdir(parents=True, exist_ok=True)
+                    ready_parents.add(parent)
                 except Exception as e:
-                    print(f"Error moving folder {src_dir}: {e}"); errors += 1
-
-            moved_roots = set(folder_moves.keys())
-            remaining = [(s, t) for (s, t, c, _) in selected_files if c.get() and not any(s == r or r in s.parents for r in moved_roots)]
+                    for src_dir, dst_dir in folder_moves.items():
+                        if dst_dir.parent == parent:
+                            print(f"Error moving folder {src_dir}: {e}"); errors += 1
+            chains: Dict[Path, List[Tuple[Path, Path]]] = defaultdict(list)
+            # shallowest first, so an ancestor is tried before its descendants
+            for src_dir in sorted(folder_moves, key=lambda d: len(d.parts)):
+                if folder_moves[src_dir].parent in ready_parents:
+                    chains[find(src_dir)].append((src_dir, folder_moves[src_dir]))
+
+            def move_folders(pairs: List[Tuple[Path, Path]]) -> Tuple[int, int, List[Path]]:
+                ok = bad = 0
+                moved: List[Path] = []
+                for src_dir, dst_dir in pairs:
+                    # went along with an ancestor that moved; if that move failed,
+                    # this folder is still moved on its own
+                    if any(a in moved for a in src_dir.parents):
+                        continue
+                    try:
+                        used = dir_names(names_by_dir, dst_dir.parent)
+                        candidate = dst_dir.with_name(reserve_name(used, dst_dir.name, ""))
+                        move(str(src_dir), str(candidate))
+                        moved.append(src_dir)
+                        ok += 1
+                    except Exception as e:
+                        print(f"Error moving folder {src_dir}: {e}"); bad += 1
+                return ok, bad, moved
+
+            moved_roots: List[Path] = []
+            with ThreadPoolExecutor(max_workers=MOVE_MAX_WORKERS) as pool:
+                futs = {pool.submit(move_folders, pairs): pairs for pairs in chains.values()}
+                for fut in as_completed(futs):
+                    try:
+                        ok, bad, moved = fut.result()
+                    except Exception as e:
+                        ok, bad, moved = 0, len(futs[fut]), []
+                        print(f"Error moving folders: {e}")
+                    success += ok; errors += bad
+                    moved_roots.extend(moved)
+
+            # skip anything inside a moved folder. Few moved roots: one C-level
+            # prefix test per file; many: walk the file's ancestors against the set
+            moved_exact = {str(r) for r in moved_roots}
+            moved_prefixes = tuple(r + os.sep for r in moved_exact)
+
+            def under_moved(s_str: str) -> bool:
+                if s_str in moved_exact:
+                    return True
+                if len(moved_prefixes) <= 32:
+                    return s_str.startswith(moved_prefixes)
+                d = os.path.dirname(s_str)
+                while True:
+                    if d in moved_exact:
+                        return True
+                    parent = os.path.dirname(d)
+                    if parent == d:
+                        return False
+                    d = parent
+
+            remaining = [(s, t) for (s, t) in checked if not under_moved(str(s))]
             total = max(1, len(remaining))
-            for i, (src, tgt) in enumerate(remaining):
+            # resolve each distinct target to its destination dir once, not per file
+            tdir_of = {t: dest_path.joinpath(*with_root(p)) for t, p in tgt_parts.items()}
+            # plan every target in this thread (dirs created once, names reserved)
+            # so the moves themselves can run concurrently without racing
+            plans: List[Tuple[Path, Path]] = []
+            made_dirs: set = set()
+            for src, tgt in remaining:
                 try:
-                    tpath = Path(tgt)
-                    if self.stay_under_root_var.get():
-                        if not (len(tpath.parts) > 0 and tpath.parts[0].lower() == self.root_name.lower()):
-                            tpath = Path(self.root_name) / tpath
-                    tdir = dest_path / tpath
-                    tdir.mkdir(parents=True, exist_ok=True)
-                    target = tdir / src.name
-                    n = 1
-                    while target.exists():
-                        target = tdir / f"{src.stem}_{n}{src.suffix}"; n += 1
-                    shutil.move(str(src), str(target))
-                    success += 1
+                    tdir = tdir_of[tgt]
+                    if tdir not in made_dirs:
+                        tdir.mkdir(parents=True, exist_ok=True)
+                        made_dirs.add(tdir)
+                    target = tdir / reserve_name(dir_names(names_by_dir, tdir), src.stem, src.suffix)
+                    plans.append((src, target))
                 except Exception as e:
                     print(f"Error organizing {src}: {e}"); errors += 1
-                prog = int((i + 1) * 100 / total)
-                self.after(0, lambda p=prog: self.progress_var.set(p))
-                self.after(0, lambda s=success, e=errors: self.status_var.set(f"Organizing... Success: {s}, Errors: {e}"))
+
+            done = errors
+            last_push, last_prog = 0.0, -1
+            with ThreadPoolExecutor(max_workers=MOVE_MAX_WORKERS) as pool:
+                fut_to_src = {pool.submit(move, str(src), str(target)): src for src, target in plans}
+                for fut in as_completed(fut_to_src):
+                    try:
+                        fut.result()
+                        success += 1
+                    except Exception as e:
+                        print(f"Error organizing {fut_to_src[fut]}: {e}"); errors += 1
+                    done += 1
+                    # at most ~30 Tk updates/sec, and only when the percentage moved
+                    prog = int(done * 100 / total)
+                    now = time.monotonic()
+                    if prog != last_prog and now - last_push >= 0.033:
+                        last_push, last_prog = now, prog
+                        self.after(0, lambda p=prog, s=success, e=errors: (self.progress_var.set(p), self.status_var.set(f"Organizing... Success: {s}, Errors: {e}")))
 
             self.after(0, lambda: self.progress_var.set(0))
             self.after(0, lambda: self.status_var.set(f"Organization complete! Success: {success}, Errors: {errors}"))
@@ -593,123 +969,339 @@ class OrganizerApp(tk.Tk):
 
     # ------------------------ Temp Log -----------------------------
     def _append_temp_log(self, obj: dict):
-        if not self.tmp_scan_path:
+        if self._tmp_fp is None:
             return
-        line = json.dumps(obj, ensure_ascii=False)
+        line = _json_bytes(obj)
+        with self.tmp_lock:
+            self._tmp_lines.append(line)
+
+    def _flush_temp_log(self):
         with self.tmp_lock:
+            lines, self._tmp_lines = self._tmp_lines, []
+            if self._tmp_fp is None or not lines:
+                return
             try:
-                with open(self.tmp_scan_path, "a", encoding="utf-8") as f:
-                    f.write(line + "\n")
+                self._tmp_fp.write(b"\n".join(lines) + b"\n")
+                self._tmp_fp.flush()
+            except Exception:
+                pass
+
+    def _close_temp_log(self):
+        self._flush_temp_log()
+        with self.tmp_lock:
+            fp, self._tmp_fp = self._tmp_fp, None
+        if fp is not None:
+            try:
+                fp.close()
             except Exception:
                 pass
 
     # ------------------------ Tree UI ------------------------------
-    def _add_file_to_tree(self, entry: Tuple[Path, str, tk.BooleanVar, str]):
-        src, ai_path, checked, status = entry
-        checkbox = "☑" if checked.get() else "☐"
-        iid = self.tree.insert("", "end", values=(checkbox, str(src), ai_path, status))
-        try:
-            self.tree.see(iid); self.tree.yview_moveto(1.0)
-        except tk.TclError:
-            pass
+    def _flush_tree_queue(self):
+        batch = []
+        while self._tree_queue and len(batch) < TREE_FLUSH_BATCH:
+            batch.append(self._tree_queue.popleft())
+        if batch:
+            self._add_files_to_tree(batch)
+        prog = self._scan_progress
+        if self.scanning and prog != self._shown_progress:
+            self._shown_progress = prog
+            done, total, walked = prog
+            if walked:
+                # total known: switch the bar from busy to a real percentage
+                self._set_progress_busy(False)
+                self.progress_var.set(int((done * 100) / max(1, total)))
+                self.status_var.set(f"Scanning... {done}/{total}")
+            else:
+                self.status_var.set(f"Scanning... {done} done, still walking the folder")
+        if self.scanning or self._tree_queue:
+            self.after(TREE_FLUSH_MS, self._flush_tree_queue)
+        else:
+            self._tree_flush_active = False
 
-        def _sync(*_):
+    def _set_progress_busy(self, busy: bool):
+        # indeterminate while the scan total is unknown; no-op if already in that mode
+        if busy == (str(self.progress.cget("mode")) == "indeterminate"):
+            return
+        if busy:
+            self.progress.configure(mode="indeterminate")
+            self.progress.start(15)
+        else:
+            self.progress.stop()
+            self.progress.configure(mode="determinate")
+            self.progress_var.set(0)
+
+    def _add_files_to_tree(self, entries: List[Tuple[Path, str, tk.BooleanVar, str]]):
+        iid = None
+        for src, ai_path, checked, status in entries:
+            checkbox = "☑" if checked.get() else "☐"
+            iid = self.tree.insert("", "end", values=(checkbox, str(src), ai_path, status))
+            self._row_checks[iid] = checked
+        if iid is not None:
             try:
-                self.tree.set(iid, "Select", "☑" if checked.get() else "☐")
+                self.tree.see(iid); self.tree.yview_moveto(1.0)
             except tk.TclError:
                 pass
-        checked.trace_add("write", _sync)
 
     def _clear_tree(self):
         self.file_items.clear()
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
+        self._tree_queue.clear()
+        self._row_checks.clear()
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
 
     # ----------------------- Helpers/State -------------------------
-    def _signature(self, p: Path) -> str:
+    def _signature(self, p: Path, st: Optional[os.stat_result] = None) -> str:
         try:
-            st = p.stat()
-            return f"{p.name}|{st.st_size}|{int(st.st_mtime)}"
+            if st is None:
+                st = os.stat(p)
+            return self._sig_digest(p.name, st.st_size, st.st_mtime_ns // 1_000_000_000)
         except Exception:
-            return f"{p.name}|0|0"
-
-    def _detect_project(self, root: Path) -> Tuple[bool, bool]:
-        found_markers = False
-        has_tf = False
+            return self._sig_digest(p.name, 0, 0)
+
+    @staticmethod
+    def _sig_digest(name: str, size: int, mtime: int) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(name.encode("utf-8", "surrogateescape"))
+        h.update(struct.pack("<qq", size, mtime))
+        return h.hexdigest()
+
+    def _migrate_history_keys(self):
+        # older caches keyed entries as "name|size|mtime"; rekey them to the digest
+        for key in [k for k in self.history if "|" in k]:
+            name, size, mtime = key.rsplit("|", 2)
+            try:
+                new_key = self._sig_digest(name, int(size), int(mtime))
+            except ValueError:
+                continue
+            self.history.setdefault(new_key, self.history[key])
+            del self.history[key]
+            self._history_dirty = True
+
+    def _detect_project(self, root: Path) -> bool:
         try:
-            entries = set(os.listdir(root))
-            if entries & PROJECT_MARKERS:
-                found_markers = True
-            for dirpath, _, filenames in os.walk(root):
-                for n in filenames:
-                    if n.endswith(".tf") or n.endswith(".tfvars") or n.endswith(".tfstate") or n.endswith(".lock.hcl"):
-                        has_tf = True
-                        break
-                if has_tf:
-                    break
+            return bool(set(os.listdir(root)) & PROJECT_MARKERS)
         except Exception:
-            pass
-        return found_markers, has_tf
+            return False
 
     def _load_history(self):
         try:
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                self.history = json.load(f)
+            self.history = _json_loads(Path(HISTORY_FILE).read_bytes())
         except Exception:
             self.history = {}
-
-    def _save_history(self):
+        # replay the journal on top of the snapshot; later lines win
+        self._history_log_lines = 0
         try:
-            with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump(self.history, f)
-        except Exception:
+            with open(HISTORY_LOG_FILE, "rb", buffering=65536) as f:
+                for raw in f:
+                    try:
+                        sig, rec = _json_loads(raw)
+                    except Exception:
+                        continue  # torn tail from a crash
+                    self.history[sig] = rec
+                    self._history_log_lines += 1
+        except OSError:
             pass
+        self._history_dirty = self._history_log_lines > 0
+        self._migrate_history_keys()
+
+    def _flush_history_log(self):
+        # O(new entries): append pending cache updates to the journal
+        with self._history_io_lock:
+            with self._history_lock:
+                lines, self._history_pending = self._history_pending, []
+            if not lines:
+                return
+            try:
+                with open(HISTORY_LOG_FILE, "ab") as f:
+                    f.write(b"\n".join(lines) + b"\n")
+                    f.flush(); os.fsync(f.fileno())
+            except Exception:
+                with self._history_lock:
+                    self._history_pending[:0] = lines
+                return
+            with self._history_lock:
+                self._history_log_lines += len(lines)
+
+    def _save_history(self):
+        # compaction: snapshot the whole cache, then drop the journal it supersedes.
+        # write a sibling temp file and swap it in, so a crash never leaves a torn cache
+        tmp = HISTORY_FILE + ".tmp"
+        with self._history_io_lock:
+            # copy under the lock; serialize and fsync outside it so workers
+            # recording results are not blocked behind the disk
+            with self._history_lock:
+                if not self._history_dirty:
+                    return
+                data = dict(self.history)
+                dropped, self._history_pending = self._history_pending, []
+                log_lines, self._history_log_lines = self._history_log_lines, 0
+                self._history_dirty = False
+            try:
+                with open(tmp, "wb", buffering=65536) as f:
+                    f.write(_json_bytes(data))
+                    f.flush(); os.fsync(f.fileno())
+                os.replace(tmp, HISTORY_FILE)
+            except Exception:
+                # snapshot not replaced: the journal still holds its lines
+                with self._history_lock:
+                    self._history_pending[:0] = dropped
+                    self._history_log_lines += log_lines
+                    self._history_dirty = True
+                return
+            try:
+                if os.path.exists(HISTORY_LOG_FILE):
+                    os.remove(HISTORY_LOG_FILE)
+            except Exception:
+                pass
 
     def _load_rules(self):
         try:
-            with open(RULES_FILE, "r", encoding="utf-8") as f:
-                self.rules = json.load(f)
+            if orjson is not None:
+                self.rules = orjson.loads(Path(RULES_FILE).read_bytes())
+            else:
+                with open(RULES_FILE, "r", encoding="utf-8") as f:
+                    self.rules = json.load(f)
         except Exception:
             self.rules = {}
+        if not isinstance(self.rules, dict):
+            self.rules = {}
+        self._rules_by_ext = {}
+        self._rules_re = []
+        # {"ext": {".pdf": "Docs/PDF"}, "regex": {"^invoice": "Finance"}}; see README
+        ext_rules = self.rules.get("ext")
+        if isinstance(ext_rules, dict):
+            for ext, target in ext_rules.items():
+                if isinstance(target, str) and target and ext.strip("."):
+                    self._rules_by_ext["." + ext.lstrip(".").lower()] = target
+        re_rules = self.rules.get("regex")
+        if isinstance(re_rules, dict):
+            for pattern, target in re_rules.items():
+                if not isinstance(target, str) or not target:
+                    continue
+                try:
+                    self._rules_re.append((re.compile(pattern, re.IGNORECASE), target))
+                except re.error:
+                    pass
+
+    def _match_rule(self, p: Path) -> Optional[str]:
+        name = p.name
+        target = self._rules_by_ext.get(_suffix_lower(name))
+        if target is not None:
+            return target
+        for rx, target in self._rules_re:
+            if rx.search(name):
+                return target
+        return None
 
     # ----------------------- Dir map & snapping --------------------
     def _build_dir_children(self):
         self._dir_children.clear()
+        self._dir_children_lc.clear()
+        self._snap_memo.clear()
+        self._snap_paths.clear()
+        self.has_terraform = False
         if not self.folder:
             return
-        for root, dirs, _ in os.walk(self.folder):
-            parent = Path(root)
+        # scandir walk: dir/file checks come from the dirent, not a stat per child.
+        # Same visiting rules as os.walk: symlinked dirs are listed, not entered.
+        # Directories whose mtime is unchanged since the last walk cost one stat.
+        cache = self._dir_listing
+        # (path, inside a SKIP_DIRS subtree)
+        stack = [(str(self.folder), False)]
+        while stack:
+            d, skipped = stack.pop()
             try:
-                self._dir_children[parent] = list(dirs)
-            except Exception:
-                self._dir_children[parent] = []
+                mtime = os.stat(d).st_mtime_ns
+            except OSError:
+                continue
+            hit = cache.get(d)
+            if hit is not None and hit[0] == mtime:
+                cache.move_to_end(d)
+            else:
+                try:
+                    it = os.scandir(d)
+                except OSError:
+                    continue
+                dirs: List[str] = []
+                descend: List[Tuple[str, bool]] = []
+                tf = False
+                with it:
+                    for e in it:
+                        try:
+                            if e.is_dir():
+                                dirs.append(e.name)
+                                if not e.is_symlink():
+                                    descend.append((e.path, e.name in SKIP_DIRS))
+                            elif not tf and e.name.endswith(_TF_SUFFIXES):
+                                tf = True
+                        except OSError:
+                            pass
+                hit = cache[d] = (mtime, dirs, {n.lower(): n for n in dirs}, descend, tf)
+                if len(cache) > DIR_LISTING_CACHE_MAX:
+                    cache.popitem(last=False)
+            _, dirs, lc, descend, tf = hit
+            parent = Path(d)
+            self._dir_children[parent] = dirs
+            self._dir_children_lc[parent] = lc
+            stack.extend((path, skipped or skip) for path, skip in descend)
+            if tf and not skipped:
+                self.has_terraform = True
 
     def _iter_children(self, parent: Path) -> Iterable[str]:
-        if parent in self._dir_children:
-            return self._dir_children[parent]
+        children = self._dir_children.get(parent)
+        if children is not None:
+            return children
+        # not mapped by the walk (symlinked, unreadable then, or created since):
+        # list it now; a missing folder simply has no children
         try:
-            names = [p.name for p in parent.iterdir() if p.is_dir()]
-        except Exception:
-            names = []
-        self._dir_children[parent] = names
-        return names
+            with os.scandir(parent) as it:
+                children = [e.name for e in it if e.is_dir()]
+        except OSError:
+            children = []
+        self._dir_children[parent] = children
+        self._dir_children_lc[parent] = {n.lower(): n for n in children}
+        return children
 
     def _snap_to_existing_dirs(self, rel: str, cutoff: float = 0.8) -> str:
-        parts = [p for p in rel.strip("/").split("/") if p]
+        done = self._snap_paths.get((rel, cutoff))
+        if done is not None:
+            return done
+        parts = list(filter(None, rel.strip("/").split("/")))
         if not parts:
             return rel
         # enforce root
-        if parts[0].lower() != self.root_name.lower():
+        if parts[0].lower() != self._root_lower:
             parts = [self.root_name] + parts
         cur = self.folder
         snapped: List[str] = [self.root_name]
         for seg in parts[1:]:
             children = self._iter_children(cur)
-            match = difflib.get_close_matches(seg, children, n=1, cutoff=cutoff)
-            chosen = match[0] if match else seg
+            lc = self._dir_children_lc.get(cur)
+            if lc is None:  # map rebuilt (folder re-chosen) since the lookup above
+                lc = {n.lower(): n for n in children}
+            chosen = lc.get(seg.lower())
+            if chosen is None:
+                key = (cur, seg, cutoff)
+                chosen = self._snap_memo.get(key)
+                if chosen is None:
+                    near = children
+                    if rf_process is not None:
+                        # fuzz.ratio is the Indel (LCS) similarity, not difflib's
+                        # matching-blocks ratio, but never below it: names under the
+                        # cutoff here are under it for difflib too. difflib still
+                        # picks among the survivors, so snapping is the same either way
+                        near = [c for c, _, _ in rf_process.extract(
+                            seg, children, scorer=fuzz.ratio, score_cutoff=cutoff * 100 - 1e-6, limit=None)]
+                    match = difflib.get_close_matches(seg, near, n=1, cutoff=cutoff)
+                    chosen = self._snap_memo[key] = match[0] if match else seg
+            elif chosen != seg and seg in children:  # case-sensitive FS with both spellings
+                chosen = seg
             snapped.append(chosen)
             cur = cur / chosen
-        return "/".join(snapped)
+        done = self._snap_paths[(rel, cutoff)] = "/".join(snapped)
+        return done
 
 
 if __name__ == "__main__":
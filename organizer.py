@@ -13,9 +13,16 @@ the main window.  Clicking "Organize Files" will create subfolders based
 on basic type categories and move the files accordingly.
 """
 
+import errno
+import json
 import os
+import re
 import shutil
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from queue import Empty, Queue
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
@@ -29,41 +36,199 @@ except ImportError as exc:
         "Install it via `pip install python-magic`."
     ) from exc
 
+try:
+    import orjson  # optional: faster loading/saving of the type cache
+except ImportError:
+    orjson = None
+
+# The Treeview only holds the rows currently on screen (see _render); the
+# row height is fixed so the visible row count can be computed from the size.
+ROW_HEIGHT = 20
+# libmagic releases the GIL while it reads file headers, so type detection
+# (one cookie per thread) scales with threads up to what the disk can deliver.
+SCAN_WORKERS = (os.cpu_count() or 4) * 2
+# The scan runs on a background thread and hands rows to the Tk thread in
+# batches of this size, which drains them every SCAN_DRAIN_MS.
+SCAN_BATCH = 256
+SCAN_DRAIN_MS = 50
+# libmagic results from earlier scans, keyed by "dev:inode:size:mtime_ns".
+# The key survives renames and moves (same inode), and any content change
+# bumps the mtime.  Kept next to the other organizer state files.
+TYPE_CACHE_FILE = "organizer_type_cache.json"
+TYPE_CACHE_MAX = 200_000
+
+
+_local = threading.local()
 
-def detect_file_type(file_path: Path) -> str:
+
+def _magic_cookie() -> "magic.Magic":
+    """Return this thread's ``magic.Magic`` instance, creating it on first use.
+
+    Opening a cookie loads the whole magic database, so each thread keeps
+    one for its lifetime.  Cookies are not shared between threads because
+    libmagic handles are not thread-safe.
+    """
+    cookie = getattr(_local, "cookie", None)
+    if cookie is None:
+        cookie = _local.cookie = magic.Magic()
+    return cookie
+
+
+def detect_file_type(file_path: "str | Path") -> str:
     """Return a short description of the file's type using python-magic.
 
-    The `python-magic` library wraps the libmagic functionality and exposes
-    `magic.from_file` to obtain a human‑readable description of a file's
-    contents.  If detection fails, ``Unknown`` is returned.
+    The `python-magic` library wraps the libmagic functionality; a
+    per-thread ``magic.Magic`` object is used to obtain a human‑readable
+    description of a file's contents.  If detection fails, ``Unknown`` is
+    returned.
     """
     try:
         # `from_file` returns a textual description such as
         # "JPEG image data" or "PDF document".  We cast to str to guard
         # against unexpected non‑string return types.
-        return str(magic.from_file(str(file_path)))
+        return str(_magic_cookie().from_file(str(file_path)))
     except Exception:
         return "Unknown"
 
 
+def iter_files(root: str):
+    """Yield the path of every regular file below ``root``.
+
+    Walks with ``os.scandir`` and an explicit stack so the file/directory
+    checks are answered from the directory entries the OS already returned,
+    instead of one ``stat`` per path as with ``Path.rglob`` + ``is_file``.
+    Symlinked directories are not descended into, matching ``rglob``.
+    """
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry.path
+                except OSError:
+                    continue
+
+
+# Extensions that identify the group on their own; these files are classified
+# without opening them.  Anything else goes through libmagic.
+EXT_TO_GROUP = {
+    **dict.fromkeys(("jpg", "jpeg", "png", "gif", "tif", "tiff", "bmp", "webp", "heic", "svg", "ico"), "Images"),
+    **dict.fromkeys(("pdf", "doc", "docx", "odt"), "Documents"),
+    **dict.fromkeys(("txt", "md", "rst", "csv", "log"), "Text"),
+    **dict.fromkeys(("mp3", "wav", "flac", "ogg", "m4a", "aac"), "Audio"),
+    **dict.fromkeys(("mp4", "avi", "mov", "mkv", "webm"), "Video"),
+    **dict.fromkeys(("zip", "tar", "gz", "tgz", "bz2", "xz", "7z", "rar"), "Archives"),
+}
+
+
+def file_extension(path: str) -> str:
+    """Return the lowercase extension of ``path`` without the dot.
+
+    Same result as ``os.path.splitext`` on the file name (leading dots do
+    not start an extension), but done with plain string methods since it
+    runs once per scanned file.
+    """
+    name = path.rpartition(os.sep)[2].lstrip(".")
+    i = name.rfind(".")
+    return name[i + 1:].lower() if i != -1 else ""
+
+
+# libmagic keywords per group, in priority order: the first group with any
+# keyword anywhere in the description wins.
+_GROUP_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), group)
+    for pattern, group in (
+        ("image|jpeg|png|gif|tiff", "Images"),
+        ("pdf|document|word", "Documents"),
+        ("text|ascii", "Text"),
+        ("audio|mp3|wav|flac", "Audio"),
+        ("video|mp4|avi|mov", "Video"),
+        ("zip|archive|compressed", "Archives"),
+    )
+]
+
+
 def assign_group(file_type: str) -> str:
     """Map a libmagic description to a higher‑level group folder name."""
-    lower = file_type.lower()
-    if any(keyword in lower for keyword in ["image", "jpeg", "png", "gif", "tiff"]):
-        return "Images"
-    if any(keyword in lower for keyword in ["pdf", "document", "word"]):
-        return "Documents"
-    if "text" in lower or "ascii" in lower:
-        return "Text"
-    if any(keyword in lower for keyword in ["audio", "mp3", "wav", "flac"]):
-        return "Audio"
-    if any(keyword in lower for keyword in ["video", "mp4", "avi", "mov"]):
-        return "Video"
-    if any(keyword in lower for keyword in ["zip", "archive", "compressed"]):
-        return "Archives"
+    for pattern, group in _GROUP_PATTERNS:
+        if pattern.search(file_type):
+            return group
     return "Other"
 
 
+def load_type_cache() -> dict[str, str]:
+    """Read the persisted libmagic cache; a missing or corrupt file is empty."""
+    try:
+        with open(TYPE_CACHE_FILE, "rb") as f:
+            data = f.read()
+        cache = orjson.loads(data) if orjson is not None else json.loads(data)
+        return cache if isinstance(cache, dict) else {}
+    except Exception:
+        return {}
+
+
+def save_type_cache(cache: dict[str, str]) -> None:
+    """Write the cache atomically, keeping the most recently used entries."""
+    items = list(cache.items())[-TYPE_CACHE_MAX:]
+    tmp = TYPE_CACHE_FILE + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            if orjson is not None:
+                f.write(orjson.dumps(dict(items)))
+            else:
+                f.write(json.dumps(dict(items), separators=(",", ":")).encode("utf-8"))
+        os.replace(tmp, TYPE_CACHE_FILE)
+    except OSError:
+        pass
+
+
+def reserve_destination(target_dir: str, name: str) -> str:
+    """Claim a free file name in ``target_dir`` and return its full path.
+
+    The name is claimed by creating an empty placeholder with ``O_EXCL``, so
+    each probe is a single syscall and two runs can never pick the same
+    name.  On collision ``_1``, ``_2``, ... is appended to the stem.
+    """
+    stem, suffix = os.path.splitext(name)
+    candidate = os.path.join(target_dir, name)
+    counter = 1
+    while True:
+        try:
+            os.close(os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            return candidate
+        except FileExistsError:
+            candidate = os.path.join(target_dir, f"{stem}_{counter}{suffix}")
+            counter += 1
+
+
+def move_file(src: str, dest: str) -> None:
+    """Move ``src`` over the reserved placeholder ``dest``.
+
+    A same-filesystem move is one ``rename``; only a cross-device move falls
+    back to ``shutil.move``.  The placeholder is removed if the move fails.
+    """
+    try:
+        try:
+            os.replace(src, dest)
+        except OSError as exc:
+            if exc.errno != errno.EXDEV:
+                raise
+            shutil.move(src, dest)
+    except OSError:
+        try:
+            os.unlink(dest)
+        except OSError:
+            pass
+        raise
+
+
 class FileOrganizerGUI(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -71,6 +236,16 @@ class FileOrganizerGUI(tk.Tk):
         self.geometry("700x500")
         self.selected_folder: Path | None = None
         self.files_info: list[tuple[str, str, str]] = []  # (file, type, group)
+        self._top = 0  # index in files_info of the first displayed row
+        # (scan id, rows or None when done) from the scan thread; only the
+        # Tk thread touches files_info.  A newer scan id makes older scans stop.
+        self._scan_queue: Queue = Queue()
+        self._scan_id = 0
+        self._scanning = False
+        self._type_cache = load_type_cache()
+        self._type_cache_dirty = False  # new entries not yet written
+        # long-lived so each worker's magic cookie survives across scans
+        self._pool = ThreadPoolExecutor(max_workers=SCAN_WORKERS)
         self._build_widgets()
 
     def _build_widgets(self) -> None:
@@ -81,13 +256,23 @@ class FileOrganizerGUI(tk.Tk):
         select_btn = ttk.Button(frame, text="Select Folder", command=self.select_folder)
         select_btn.pack(side=tk.TOP, pady=5)
 
-        # Treeview for listing files
+        # Treeview for listing files.  It is virtual: files_info is the data
+        # and only the visible window of it is inserted, so Tk holds a
+        # screenful of items no matter how many files were scanned.
+        ttk.Style(self).configure("Treeview", rowheight=ROW_HEIGHT)
+        body = ttk.Frame(frame)
+        body.pack(fill=tk.BOTH, expand=True)
         columns = ("File", "Type", "Group")
-        self.tree = ttk.Treeview(frame, columns=columns, show="headings")
+        self.tree = ttk.Treeview(body, columns=columns, show="headings")
         for col in columns:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=200)
-        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.vsb = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.tree.bind("<Configure>", lambda _event: self._render())
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_wheel)
 
         # Organize button
         org_btn = ttk.Button(frame, text="Organize Files", command=self.organize_files)
@@ -101,24 +286,149 @@ class FileOrganizerGUI(tk.Tk):
         self.scan_files()
 
     def scan_files(self) -> None:
-        """Scan the selected folder for files and display their types."""
+        """Scan the selected folder for files and display their types.
+
+        The walk and type detection run on a background thread; rows are
+        appended to the listing as batches arrive, so the window stays
+        responsive while large folders are scanned.
+        """
         if not self.selected_folder:
             return
+        self._scan_id += 1
+        self._scanning = True
         self.files_info.clear()
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for file_path in self.selected_folder.rglob("*"):
-            if file_path.is_file():
-                try:
-                    ftype = detect_file_type(file_path)
-                except Exception:
-                    ftype = "Unknown"
+        self._top = 0
+        self._render()
+        threading.Thread(
+            target=self._scan_worker,
+            args=(self._scan_id, str(self.selected_folder)),
+            daemon=True,
+        ).start()
+        self.after(SCAN_DRAIN_MS, self._drain_scan_queue, self._scan_id)
+
+    def _scan_worker(self, scan_id: int, root: str) -> None:
+        """Walk ``root`` and classify its files, queueing rows in batches.
+
+        The walk is consumed in SCAN_BATCH chunks, so memory stays bounded
+        and the first rows appear before the walk has finished.
+        """
+        try:
+            # every walked path starts with this prefix, so the relative path is a slice
+            cut = len(os.path.join(root, ""))
+            paths: list[str] = []
+            for path in iter_files(root):
+                if scan_id != self._scan_id:
+                    return  # superseded by a newer scan
+                paths.append(path)
+                if len(paths) >= SCAN_BATCH:
+                    self._scan_queue.put((scan_id, self._classify(paths, cut)))
+                    paths = []
+            if paths:
+                self._scan_queue.put((scan_id, self._classify(paths, cut)))
+            if self._type_cache_dirty:
+                self._type_cache_dirty = False
+                save_type_cache(self._type_cache)
+        finally:
+            self._scan_queue.put((scan_id, None))
+
+    def _classify(self, paths: list[str], cut: int) -> list[tuple[str, str, str]]:
+        """Return ``(relative path, type, group)`` rows for ``paths``."""
+        exts = [file_extension(p) for p in paths]
+        # only files whose extension is not conclusive are read by libmagic;
+        # detect_file_type never raises, so map() yields one type per miss in order
+        misses = [p for p, ext in zip(paths, exts) if ext not in EXT_TO_GROUP]
+        detected = iter(self._pool.map(self._detect_cached, misses))
+        rows = []
+        for file_path, ext in zip(paths, exts):
+            group = EXT_TO_GROUP.get(ext)
+            if group is None:
+                ftype = next(detected)
                 group = assign_group(ftype)
-                relative_path = file_path.relative_to(self.selected_folder)
-                self.files_info.append((str(relative_path), ftype, group))
-                self.tree.insert("", tk.END, values=(relative_path, ftype, group))
+            else:
+                ftype = f"{ext} (by extension)"
+            rows.append((file_path[cut:], ftype, group))
+        return rows
+
+    def _drain_scan_queue(self, scan_id: int) -> None:
+        """Move queued rows into ``files_info`` and refresh the visible window."""
+        if scan_id != self._scan_id:
+            return
+        done = False
+        added = False
+        while True:
+            try:
+                batch_id, rows = self._scan_queue.get_nowait()
+            except Empty:
+                break
+            if batch_id != scan_id:
+                continue  # leftovers from a superseded scan
+            if rows is None:
+                done = True
+                break
+            self.files_info.extend(rows)
+            added = True
+        if added:
+            self._render()
+        if done:
+            self._scanning = False
+        else:
+            self.after(SCAN_DRAIN_MS, self._drain_scan_queue, scan_id)
+
+    def _detect_cached(self, path: str) -> str:
+        """``detect_file_type`` behind the persistent (inode, size, mtime) cache."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return detect_file_type(path)
+        key = f"{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+        # pop + reinsert keeps the dict ordered by last use for trimming on save
+        ftype = self._type_cache.pop(key, None)
+        if ftype is None:
+            ftype = detect_file_type(path)
+            if ftype == "Unknown":
+                return ftype
+            self._type_cache_dirty = True
+        self._type_cache[key] = ftype
+        return ftype
+
+    def _visible_count(self) -> int:
+        # one row's worth of height is left for the column headings
+        return max(1, self.tree.winfo_height() // ROW_HEIGHT - 1)
+
+    def _render(self) -> None:
+        """Show the rows of ``files_info`` that fit, starting at ``_top``."""
+        total = len(self.files_info)
+        count = self._visible_count()
+        self._top = max(0, min(self._top, total - count))
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        for row in self.files_info[self._top:self._top + count]:
+            self.tree.insert("", tk.END, values=row)
+        if total:
+            self.vsb.set(self._top / total, min(1.0, (self._top + count) / total))
+        else:
+            self.vsb.set(0.0, 1.0)
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str | None = None) -> None:
+        if action == tk.MOVETO:
+            self._top = int(float(amount) * len(self.files_info))
+        elif action == tk.SCROLL:
+            step = self._visible_count() if unit == tk.PAGES else 1
+            self._top += int(amount) * step
+        self._render()
+
+    def _on_wheel(self, event: tk.Event) -> str:
+        # X11 sends Button-4/5; Windows and macOS send a signed delta
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self._top += -3 if up else 3
+        self._render()
+        return "break"
 
     def organize_files(self) -> None:
+        if self._scanning:
+            messagebox.showinfo("Scanning", "Please wait for the scan to finish.")
+            return
         if not self.selected_folder or not self.files_info:
             messagebox.showinfo("No files", "Please select a folder and scan files first.")
             return
@@ -126,20 +436,20 @@ class FileOrganizerGUI(tk.Tk):
         if not messagebox.askyesno(
             "Confirm", "Create folders and move files? This will reorganize files."):
             return
+        # Group first so each target folder is created once and its moves
+        # run back to back.
+        root = str(self.selected_folder)
+        by_group: dict[str, list[str]] = defaultdict(list)
         for rel_path, _ftype, group in self.files_info:
-            src = self.selected_folder / rel_path
-            target_dir = self.selected_folder / group
-            target_dir.mkdir(exist_ok=True)
-            dest = target_dir / src.name
-            # If destination exists, append a counter
-            counter = 1
-            new_dest = dest
-            while new_dest.exists():
-                stem, suffix = os.path.splitext(src.name)
-                new_name = f"{stem}_{counter}{suffix}"
-                new_dest = target_dir / new_name
-                counter += 1
-            shutil.move(str(src), str(new_dest))
+            by_group[group].append(rel_path)
+        for group, rel_paths in by_group.items():
+            target_dir = os.path.join(root, group)
+            os.makedirs(target_dir, exist_ok=True)
+            for rel_path in rel_paths:
+                src = os.path.join(root, rel_path)
+                # If destination exists, a counter is appended to the name
+                dest = reserve_destination(target_dir, os.path.basename(src))
+                move_file(src, dest)
         messagebox.showinfo("Done", "Files have been organized.")
         self.scan_files()  # Refresh the listing
 
@@ -0,0 +1,70 @@
+"""
+Pure, fully typed helpers on the AI organizer's per-file hot path.
+
+Nothing here touches Tk or application state, so the module can be
+compiled as-is with ``mypyc organizer_core.py`` (or Cython) for a faster
+build; the plain-Python module is used otherwise.
+"""
+
+import re
+from typing import List
+
+# AI response parsing (all patterns compiled once; used for every model reply)
+_PATH_JSON_RE = re.compile(r'{\s*"path"\s*:\s*"([^"]+)"}', re.IGNORECASE)
+_CANDIDATE_RE = re.compile(r"([A-Za-z0-9 _.-]+(?:/[A-Za-z0-9 _.-]+){0,2})")
+_CODEFENCE_RE = re.compile(r"```.*?```", re.DOTALL)
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL | re.IGNORECASE)
+_HEADING_RE = re.compile(r"^#+\s.*$", re.MULTILINE)
+_FILLER_RE = re.compile(r"\b(the cleaned compact path would be|the path would be|the best path is|final path:)\b.*", re.IGNORECASE)
+_STOPWORD_RE = re.compile(r"\b(is|are|the|this|that|here|would)\b", re.IGNORECASE)
+_MULTISPACE_RE = re.compile(r"\s{2,}")
+_MULTISLASH_RE = re.compile(r"/{2,}")
+# characters that are invalid in folder names on common filesystems
+BAD_CHARS_TABLE = str.maketrans("", "", '<>:"|?*')
+
+
+def _score_candidate(c: str) -> int:
+    c = c.strip().strip("./ ")
+    # joined segment length == length without the slashes
+    score = 10 - min(9, len(c) - c.count("/"))
+    if len(c.split()) > 6:
+        score -= 3
+    if _STOPWORD_RE.search(c):
+        score -= 2
+    return score
+
+
+def extract_path_from_text(text: str) -> str:
+    """Pull the most path-like fragment (max 3 levels) out of a model reply."""
+    if not text:
+        return ""
+    m = _PATH_JSON_RE.search(text)
+    if m:
+        return m.group(1).strip()
+    text = _CODEFENCE_RE.sub("", text)
+    text = _THINK_RE.sub("", text)
+    text = _HEADING_RE.sub("", text)
+    text = _FILLER_RE.sub("", text)
+    candidates: List[str] = _CANDIDATE_RE.findall(text)
+    candidates = [c.strip() for c in candidates if ("/" in c) or (len(c.split()) <= 4)]
+    if not candidates:
+        return ""
+    best = max(candidates, key=_score_candidate).strip().strip("./ ")
+    best = _MULTISPACE_RE.sub(" ", best)
+    best = _MULTISLASH_RE.sub("/", best)
+    parts = [p.strip() for p in best.split("/") if p.strip()]
+    return "/".join(parts[:3])
+
+
+def sanitize_path(text: str) -> str:
+    """Turn a raw model reply into a clean relative path (max 3 levels)."""
+    extracted = extract_path_from_text(text)
+    candidate = extracted if extracted else (text or "")
+    candidate = candidate.strip().replace("\\", "/").splitlines()[0].lstrip("/").strip()
+    candidate = candidate.translate(BAD_CHARS_TABLE)
+    if not candidate:
+        candidate = "Uncategorized"
+    parts = [p for p in candidate.split("/") if p]
+    if len(parts) > 3:
+        parts = parts[:3]
+    return "/".join(parts)